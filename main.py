@@ -5,11 +5,126 @@ Analyzes project structure and generates formatted code documentation
 Supports multiple programming languages (Python, JavaScript/TypeScript, Java, C++, etc.)
 """
 
+import codecs
+import heapq
+import io
+import mmap
+import operator
 import os
+import queue
 import sys
+import shutil
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import re
-from typing import Dict, List, Set, Optional, Tuple
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, NamedTuple, Set, Optional, Tuple, Union
+
+# Buffer size for the output file so small writes don't each hit the kernel
+_OUTPUT_BUFFER_SIZE = 1 << 20
+
+# Number of files read ahead of the writer; bounds memory to a small window
+_READ_AHEAD = 64
+
+# Reader threads in the scan/read/write pipeline
+_READ_WORKERS = 8
+
+# Files above this size are memory-mapped and written straight from the mapping
+_MMAP_THRESHOLD = 256 * 1024
+
+# Slice size when scanning a mapping, so no full-size copy is ever made
+_MMAP_CHUNK = 1 << 20
+
+# Precomputed indents and separator lines, reused for every file
+_INDENT = tuple('  ' * i for i in range(64))
+_EQ100 = '=' * 100
+_DASH100 = '-' * 100
+_SEP43 = '-' * 43
+_SECTION_END = f"\n\n{_EQ100}\n".encode('utf-8')
+
+
+class FileEntry(NamedTuple):
+    """A scanned code file, with its paths captured once during the scan"""
+    abs_path: str
+    rel_path: str
+    name: str
+    ext: str
+
+
+# C-level sort key for files within a directory
+_BY_NAME = operator.attrgetter('name')
+
+def _count_lines(data: Union[bytes, mmap.mmap]) -> int:
+    """Count lines like len(text.splitlines()) without building the list"""
+    if isinstance(data, mmap.mmap):
+        # mmap has no count(); scan it in bounded slices
+        newlines = sum(data[i:i + _MMAP_CHUNK].count(b'\n') for i in range(0, len(data), _MMAP_CHUNK))
+        return newlines + (1 if data and data[-1:] != b'\n' else 0)
+    return data.count(b'\n') + (1 if data and not data.endswith(b'\n') else 0)
+
+
+def _append_file(src: BinaryIO, dst: BinaryIO) -> None:
+    """Append all of src to dst, copying inside the kernel where the platform allows
+
+    copy_file_range keeps the data out of user space, and on filesystems with
+    reflinks (btrfs, XFS) it shares the blocks instead of writing them again.
+    """
+    src.flush()
+    dst.flush()
+    offset = 0
+    copy_range = getattr(os, 'copy_file_range', None)
+    if copy_range is not None:
+        in_fd, out_fd = src.fileno(), dst.fileno()
+        try:
+            while True:
+                copied = copy_range(in_fd, out_fd, 1 << 30, offset)
+                if not copied:
+                    return
+                offset += copied
+        except OSError:
+            # e.g. cross-device copies on older kernels; finish in user space
+            pass
+    src.seek(offset)
+    shutil.copyfileobj(src, dst, _OUTPUT_BUFFER_SIZE)
+
+
+class _LinesepWriter:
+    """Binary writer that writes '\n' as os.linesep, as text-mode output did"""
+    
+    def __init__(self, raw: BinaryIO):
+        self._raw = raw
+        self._linesep = os.linesep.encode('ascii')
+    
+    def write(self, data) -> int:
+        return self._raw.write(bytes(data).replace(b'\n', self._linesep))
+
+
+def _native_newlines(out: BinaryIO) -> BinaryIO:
+    """Return a writer for out that keeps the platform's line endings (CRLF on Windows)"""
+    if os.linesep == '\n':
+        # POSIX: bytes go through untouched
+        return out
+    return _LinesepWriter(out)
+
+
+# Language names by lower-case file extension
+_LANGUAGES = {
+    '.py': 'Python', '.js': 'JavaScript', '.ts': 'TypeScript', 
+    '.tsx': 'TypeScript React', '.jsx': 'JavaScript React',
+    '.java': 'Java', '.cpp': 'C++', '.cc': 'C++', '.cxx': 'C++',
+    '.c': 'C', '.h': 'C/C++ Header', '.hpp': 'C++ Header',
+    '.cs': 'C#', '.php': 'PHP', '.rb': 'Ruby', '.go': 'Go',
+    '.rs': 'Rust', '.kt': 'Kotlin', '.swift': 'Swift',
+    '.m': 'Objective-C', '.mm': 'Objective-C++', '.scala': 'Scala',
+    '.clj': 'Clojure', '.hs': 'Haskell', '.ml': 'OCaml', '.fs': 'F#',
+    '.dart': 'Dart', '.lua': 'Lua', '.r': 'R', '.pl': 'Perl',
+    '.sh': 'Shell', '.bash': 'Bash', '.zsh': 'Zsh', '.fish': 'Fish',
+    '.sql': 'SQL', '.json': 'JSON', '.xml': 'XML', '.yaml': 'YAML',
+    '.yml': 'YAML', '.toml': 'TOML', '.ini': 'INI', '.cfg': 'Config'
+}
+
 
 class CodebaseParser:
     def __init__(self, root_path: str = ".", output_file: str = "code.txt"):
@@ -17,222 +132,381 @@ class CodebaseParser:
         self.output_file = output_file
         
         # Supported file extensions for different languages
-        self.code_extensions = {
+        # (frozensets: immutable, checked on every scanned entry)
+        self.code_extensions = frozenset(sys.intern(ext) for ext in {
             '.py', '.js', '.ts', '.tsx', '.jsx', '.java', '.cpp', '.cc', '.cxx', 
             '.c', '.h', '.hpp', '.cs', '.php', '.rb', '.go', '.rs', '.kt', 
             '.swift', '.m', '.mm', '.scala', '.clj', '.hs', '.ml', '.fs',
             '.dart', '.lua', '.r', '.pl', '.sh', '.bash', '.zsh', '.fish',
             '.sql', '.json', '.xml', '.yaml', '.yml', '.toml', '.ini', '.cfg'
-        }
+        })
         
         # Directories to ignore
-        self.ignore_dirs = {
+        self.ignore_dirs = frozenset({
             'node_modules', '__pycache__', '.git', '.svn', '.hg', 'build', 
             'dist', 'target', 'bin', 'obj', '.gradle', '.idea', '.vscode',
             'vendor', 'coverage', '.nyc_output', 'logs', 'tmp', 'temp',
             '.next', '.nuxt', 'out', 'public/build', 'venv', 'env', '.env'
-        }
+        })
         
         # Files to ignore
-        self.ignore_files = {
+        self.ignore_files = frozenset({
             '.gitignore', '.dockerignore', 'package-lock.json', 'yarn.lock',
             'Pipfile.lock', 'poetry.lock', '.DS_Store', 'Thumbs.db',
             'desktop.ini', '*.log', '*.tmp', '*.temp'
-        }
+        })
+        
+        self._refresh_lookups()
+
+    def _refresh_lookups(self) -> None:
+        """Rebuild the scan lookups derived from code_extensions, ignore_dirs and ignore_files
+
+        The sets are frozen, so customising them means reassigning them; each
+        scan calls this so a reassignment is never silently ignored.
+        """
+        # Extension tuple for str.endswith filtering during the scan
+        self._code_exts_tuple = tuple(self.code_extensions)
+        
+        # Precomputed file ignore lookups for the scan hot path
+        self._ignore_suffixes = tuple(p[1:] for p in self.ignore_files if p.startswith('*'))
+        self._ignore_names = frozenset(n for n in self.ignore_files if '*' not in n)
+        
+        # Path-segment markers so should_ignore_path can test parent
+        # directories with one substring search instead of walking path.parents
+        self._ignore_dir_markers = tuple(f'{os.sep}{d}{os.sep}' for d in self.ignore_dirs)
+
+    def add_code_extensions(self, extensions: List[str]) -> None:
+        """Add extra file extensions to scan, e.g. ['vue', '.svelte']"""
+        new_exts = {ext.lower() if ext.startswith('.') else '.' + ext.lower() for ext in extensions}
+        self.code_extensions = self.code_extensions | frozenset(sys.intern(ext) for ext in new_exts)
+        self._refresh_lookups()
 
     def should_ignore_path(self, path: Path) -> bool:
-        """Check if a path should be ignored"""
-        # Check if any parent directory is in ignore list
-        for parent in path.parents:
-            if parent.name in self.ignore_dirs:
-                return True
+        """Check if a path should be ignored, by name only (no stat calls)"""
+        name = path.name
         
         # Check if current directory is in ignore list
-        if path.is_dir() and path.name in self.ignore_dirs:
+        if name in self.ignore_dirs:
+            return True
+        
+        # Check if any parent directory below the root is in ignore list
+        path_str = os.fspath(path)
+        root_str = str(self.root_path)
+        if path_str == root_str or path_str.startswith(root_str + os.sep):
+            path_str = path_str[len(root_str):]
+        else:
+            # Relative paths and paths outside the root (such as siblings that
+            # share its name as a prefix): let the first segment match a marker too
+            path_str = os.sep + path_str
+        if any(marker in path_str for marker in self._ignore_dir_markers):
             return True
             
         # Check if file should be ignored
-        if path.is_file():
-            if path.name in self.ignore_files:
-                return True
-            # Check for pattern matches
-            for ignore_pattern in self.ignore_files:
-                if '*' in ignore_pattern and path.name.endswith(ignore_pattern[1:]):
-                    return True
-                    
-        return False
+        return name in self._ignore_names or name.endswith(self._ignore_suffixes)
 
     def is_code_file(self, file_path: Path) -> bool:
         """Check if file is a code file based on extension"""
         return file_path.suffix.lower() in self.code_extensions
 
     def get_language_from_extension(self, extension: str) -> str:
-        """Get language name from file extension"""
-        lang_map = {
-            '.py': 'Python', '.js': 'JavaScript', '.ts': 'TypeScript', 
-            '.tsx': 'TypeScript React', '.jsx': 'JavaScript React',
-            '.java': 'Java', '.cpp': 'C++', '.cc': 'C++', '.cxx': 'C++',
-            '.c': 'C', '.h': 'C/C++ Header', '.hpp': 'C++ Header',
-            '.cs': 'C#', '.php': 'PHP', '.rb': 'Ruby', '.go': 'Go',
-            '.rs': 'Rust', '.kt': 'Kotlin', '.swift': 'Swift',
-            '.m': 'Objective-C', '.mm': 'Objective-C++', '.scala': 'Scala',
-            '.clj': 'Clojure', '.hs': 'Haskell', '.ml': 'OCaml', '.fs': 'F#',
-            '.dart': 'Dart', '.lua': 'Lua', '.r': 'R', '.pl': 'Perl',
-            '.sh': 'Shell', '.bash': 'Bash', '.zsh': 'Zsh', '.fish': 'Fish',
-            '.sql': 'SQL', '.json': 'JSON', '.xml': 'XML', '.yaml': 'YAML',
-            '.yml': 'YAML', '.toml': 'TOML', '.ini': 'INI', '.cfg': 'Config'
-        }
-        return lang_map.get(extension.lower(), 'Unknown')
+        """Get language name from an already lower-cased file extension"""
+        return _LANGUAGES.get(extension, 'Unknown')
+
+    def _walk(self, top: str, top_key: str = '.') -> Iterator[Tuple[str, FileEntry]]:
+        """Yield (directory, file) for every code file below top, in output order
+
+        Directories come out in sorted order of their relative path and files
+        sorted by name, so callers can stream sections without sorting. Pending
+        directories sit in a heap keyed by relative path: a subdirectory's key
+        always extends its parent's, so popping the smallest key can never skip
+        ahead of a directory that has not been discovered yet.
+
+        top_key is top's path relative to the root ('.' for the root itself),
+        so keys and rel_paths stay root-relative when scanning a subdirectory.
+        """
+        # Entries are (relative dir, kind, payload); kind 0 = scan path, 1 = emit files
+        heap = [(top_key, 0, top)]
+        
+        while heap:
+            directory, kind, payload = heapq.heappop(heap)
+            if kind:
+                for file in payload:
+                    yield directory, file
+                continue
+            
+            prefix = '' if directory == '.' else directory + os.sep
+            files = []
+            try:
+                with os.scandir(payload) as entries:
+                    for entry in entries:
+                        name = entry.name
+                        if entry.is_dir(follow_symlinks=False):
+                            # Prune ignored directories before descending
+                            if name not in self.ignore_dirs:
+                                heapq.heappush(heap, (prefix + name, 0, entry.path))
+                        # Filter on the name before any stat or Path construction; is_file()
+                        # follows links so symlinked files are kept, as Path.is_file() did.
+                        # Bare dotfiles such as '.py' have no suffix, so require a stem.
+                        elif ((lower := name.lower()).endswith(self._code_exts_tuple)
+                                and (dot := lower.rfind('.')) > 0 and entry.is_file()):
+                            if name in self._ignore_names or name.endswith(self._ignore_suffixes):
+                                continue
+                            # Lower-cased extension, computed once for every later lookup
+                            ext = lower[dot:]
+                            files.append(FileEntry(entry.path, prefix + name, name, ext))
+            except PermissionError as e:
+                print(f"Permission denied accessing: {e}")
+            
+            if files:
+                # Root files are queued too: top-level directory names may sort before '.'
+                files.sort(key=_BY_NAME)
+                heapq.heappush(heap, (directory, 1, files))
+
+    def scan_directory(self, directory: Path) -> Dict[str, List[FileEntry]]:
+        """Scan directory and organize files by their parent directories
 
-    def scan_directory(self, directory: Path) -> Dict[str, List[Path]]:
-        """Scan directory and organize files by their parent directories"""
+        Directories and the files in each are already in output order, so
+        consumers iterate the structure as-is instead of sorting it again.
+        """
         structure = {}
+        self._refresh_lookups()
         
         try:
-            for item in directory.rglob('*'):
-                if self.should_ignore_path(item):
-                    continue
-                
-                if item.is_file() and self.is_code_file(item):
-                    # Get relative path from root
-                    rel_path = item.relative_to(self.root_path)
-                    parent_dir = str(rel_path.parent) if rel_path.parent.name != '.' else 'root'
-                    
-                    if parent_dir not in structure:
-                        structure[parent_dir] = []
-                    structure[parent_dir].append(item)
+            # Keys stay relative to the root even when scanning a subdirectory
+            top_key = str(Path(directory).relative_to(self.root_path))
+            for parent_dir, file in self._walk(str(directory), top_key):
+                if parent_dir not in structure:
+                    structure[parent_dir] = []
+                structure[parent_dir].append(file)
         
-        except PermissionError as e:
-            print(f"Permission denied accessing: {e}")
         except Exception as e:
             print(f"Error scanning directory: {e}")
             
         return structure
 
-    def read_file_content(self, file_path: Path) -> Optional[str]:
-        """Read file content with proper encoding detection"""
+    def _map_utf8_file(self, f) -> Optional[mmap.mmap]:
+        """Memory-map a file if it can be written out verbatim, else return None"""
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        # Files needing newline normalisation take the regular read path
+        if mapped.find(b'\r') != -1:
+            mapped.close()
+            return None
+        
+        # Validate UTF-8 slice by slice without materialising the text
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        try:
+            for start in range(0, len(mapped), _MMAP_CHUNK):
+                decoder.decode(mapped[start:start + _MMAP_CHUNK])
+            decoder.decode(b'', final=True)
+        except UnicodeDecodeError:
+            mapped.close()
+            return None
+        return mapped
+
+    def read_file_bytes(self, file_path: Union[str, Path]) -> Union[bytes, mmap.mmap]:
+        """Read file content as UTF-8 bytes, ready to be written to the output
+
+        Valid UTF-8 files are returned as read, so they never go through a
+        decode/encode round trip on the way to the output file. Large ones
+        come back as a read-only mmap the caller should close when done.
+        """
+        try:
+            # Single unbuffered binary read; FileIO.readall sizes the buffer from fstat
+            with open(file_path, 'rb', buffering=0) as f:
+                size = os.fstat(f.fileno()).st_size
+                if size == 0:
+                    # Empty files need no read or decode
+                    return b''
+                if size > _MMAP_THRESHOLD:
+                    mapped = self._map_utf8_file(f)
+                    if mapped is not None:
+                        return mapped
+                data = f.read()
+        except Exception as e:
+            return f"Error reading file: {e}".encode('utf-8')
+        
         try:
             # Try UTF-8 first
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return f.read()
+            text = data.decode('utf-8')
         except UnicodeDecodeError:
+            # Fallback to latin-1 if UTF-8 fails, without reopening the file
+            text = data.decode('latin-1')
+        else:
+            if b'\r' not in data:
+                return data
+        
+        # Match text-mode universal newlines
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        return text.encode('utf-8')
+
+    def read_file_content(self, file_path: Union[str, Path]) -> Optional[str]:
+        """Read file content with proper encoding detection"""
+        data = self.read_file_bytes(file_path)
+        text = str(data, 'utf-8')
+        if isinstance(data, mmap.mmap):
+            data.close()
+        return text
+
+    def _iter_pipeline(self, structure: Dict[str, List[FileEntry]]) -> Iterator[Tuple[str, FileEntry, bytes]]:
+        """Scan, read and yield (directory, file, content) in output order as one pipeline
+
+        A producer thread walks the tree into a bounded queue while a thread
+        pool reads ahead of the caller, so scanning, reading and writing all
+        overlap. structure is filled in as files are discovered.
+        """
+        self._refresh_lookups()
+        
+        found = queue.Queue(maxsize=_READ_AHEAD)
+        stop = threading.Event()
+        
+        def produce():
             try:
-                # Fallback to latin-1 if UTF-8 fails
-                with open(file_path, 'r', encoding='latin-1') as f:
-                    return f.read()
+                for item in self._walk(str(self.root_path)):
+                    if stop.is_set():
+                        break
+                    found.put(item)
             except Exception as e:
-                return f"Error reading file: {e}"
-        except Exception as e:
-            return f"Error reading file: {e}"
+                print(f"Error scanning directory: {e}")
+            finally:
+                found.put(None)
+        
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
+        
+        # Overlap open()/read() syscalls; file I/O releases the GIL
+        item = ()
+        try:
+            with ThreadPoolExecutor(max_workers=_READ_WORKERS) as executor:
+                pending = deque()
+                while True:
+                    item = found.get()
+                    if item is None:
+                        break
+                    
+                    directory, file = item
+                    if directory not in structure:
+                        structure[directory] = []
+                    structure[directory].append(file)
+                    
+                    pending.append((directory, file, executor.submit(self.read_file_bytes, file.abs_path)))
+                    
+                    if len(pending) >= _READ_AHEAD:
+                        directory, file, future = pending.popleft()
+                        yield from self._yield_and_release(directory, file, future.result())
+                
+                while pending:
+                    directory, file, future = pending.popleft()
+                    yield from self._yield_and_release(directory, file, future.result())
+        finally:
+            # Unblock the producer if the consumer stopped early
+            stop.set()
+            while item is not None:
+                item = found.get()
+            producer.join()
+
+    @staticmethod
+    def _yield_and_release(directory: str, file: FileEntry, content) -> Iterator[Tuple[str, FileEntry, bytes]]:
+        """Yield one pipeline item, unmapping its content once the consumer is done"""
+        try:
+            yield directory, file, content
+        finally:
+            if isinstance(content, mmap.mmap):
+                content.close()
 
     def generate_separator(self, text: str, char: str = '-', length: int = 43) -> str:
         """Generate a separator line with text"""
+        if char == '-' and length == 43:
+            return _SEP43 + text + _SEP43
         return char * length + text + char * length
 
-    def format_directory_structure(self, structure: Dict[str, List[Path]]) -> str:
-        """Format the directory structure as a tree"""
-        result = []
-        result.append("Code Structure:")
-        
-        # Sort directories for consistent output
-        sorted_dirs = sorted(structure.keys())
+    def format_directory_structure(self, structure: Dict[str, List[FileEntry]], out: BinaryIO) -> None:
+        """Write the directory structure as a tree"""
+        out.write(b"Code Structure:")
         
-        for directory in sorted_dirs:
+        # The structure is built in sorted order by the scan
+        for directory, files in structure.items():
             if directory == 'root':
-                result.append(".")
+                out.write(b"\n.")
             else:
                 # Create indented structure
                 parts = directory.split(os.sep)
                 for i, part in enumerate(parts):
-                    indent = "  " * i
-                    result.append(f"{indent}{part}")
+                    indent = _INDENT[i] if i < 64 else "  " * i
+                    out.write(f"\n{indent}{part}".encode('utf-8'))
             
             # Add files in this directory
-            files = sorted(structure[directory], key=lambda x: x.name)
-            for file_path in files:
-                rel_path = file_path.relative_to(self.root_path)
-                depth = len(rel_path.parts) - 1
-                indent = "  " * (depth + 1)
-                result.append(f"{indent}{file_path.name}")
-        
-        return "\n".join(result)
+            for file in files:
+                depth = file.rel_path.count(os.sep)
+                indent = _INDENT[depth + 1] if depth < 63 else "  " * (depth + 1)
+                out.write(f"\n{indent}{file.name}".encode('utf-8'))
 
-    def generate_code_output(self, structure: Dict[str, List[Path]]) -> str:
-        """Generate the formatted code output with separators and content"""
-        result = []
-        
-        # Add structure overview
-        result.append(self.format_directory_structure(structure))
-        result.append("\n" + "=" * 100 + "\n")
-        
-        # Sort directories for consistent output
-        sorted_dirs = sorted(structure.keys())
+    def generate_code_output(self, files: Iterable[Tuple[str, FileEntry, bytes]], out: BinaryIO) -> int:
+        """Stream a formatted section per (directory, file, content) as it arrives
+
+        Returns the total number of lines written.
+        """
+        total_lines = 0
         
-        for directory in sorted_dirs:
-            files = sorted(structure[directory], key=lambda x: x.name)
+        for directory, file, content in files:
+            # Get file info
+            file_name = file.name[:-len(file.ext)]  # filename without extension
             
-            for file_path in files:
-                # Get file info
-                rel_path = file_path.relative_to(self.root_path)
-                file_name = file_path.stem  # filename without extension
-                extension = file_path.suffix
-                language = self.get_language_from_extension(extension)
-                
-                # Create section header
-                section_header = f"{directory}/{file_name}"
-                if directory == 'root':
-                    section_header = file_name
-                    
-                result.append(self.generate_separator(section_header))
-                result.append(f"File: {rel_path}")
-                result.append("-" * 100)
-                
-                # Read and add file content
-                content = self.read_file_content(file_path)
-                if content:
-                    result.append(content)
-                else:
-                    result.append("// Unable to read file content")
+            # Create section header
+            section_header = f"{directory}/{file_name}"
+            if directory == 'root':
+                section_header = file_name
                 
-                result.append("\n" + "=" * 100 + "\n")
+            out.write(f"\n{self.generate_separator(section_header)}"
+                      f"\nFile: {file.rel_path}"
+                      f"\n{_DASH100}\n".encode('utf-8'))
+            
+            # Add file content, already UTF-8 encoded
+            if content:
+                total_lines += _count_lines(content)
+                out.write(content)
+            else:
+                out.write(b"// Unable to read file content")
+            
+            out.write(_SECTION_END)
         
-        return "\n".join(result)
+        return total_lines
+
+    def get_project_stats(self, structure: Dict[str, List[FileEntry]], total_lines: int) -> Dict[str, int]:
+        """Get statistics about the project
 
-    def get_project_stats(self, structure: Dict[str, List[Path]]) -> Dict[str, int]:
-        """Get statistics about the project"""
+        total_lines comes from the output pass, the only place files are read.
+        """
         stats = {
             'total_files': 0,
             'total_directories': len(structure),
-            'total_lines': 0,
+            'total_lines': total_lines,
             'languages': {}
         }
         
         for directory, files in structure.items():
             stats['total_files'] += len(files)
             
-            for file_path in files:
-                # Count lines
-                content = self.read_file_content(file_path)
-                if content and isinstance(content, str):
-                    stats['total_lines'] += len(content.splitlines())
-                
+            for file in files:
                 # Count languages
-                language = self.get_language_from_extension(file_path.suffix)
+                language = self.get_language_from_extension(file.ext)
                 stats['languages'][language] = stats['languages'].get(language, 0) + 1
         
         return stats
 
-    def generate_summary(self, structure: Dict[str, List[Path]], stats: Dict[str, int]) -> str:
-        """Generate a summary of the codebase"""
-        summary = []
-        summary.append("=" * 100)
-        summary.append("CODEBASE SUMMARY")
-        summary.append("=" * 100)
-        summary.append(f"Total Files: {stats['total_files']}")
-        summary.append(f"Total Directories: {stats['total_directories']}")
-        summary.append(f"Total Lines of Code: {stats['total_lines']}")
-        summary.append(f"Root Directory: {self.root_path}")
-        summary.append("")
+    def generate_summary(self, structure: Dict[str, List[FileEntry]], stats: Dict[str, int], out: BinaryIO) -> None:
+        """Write a summary of the codebase"""
+        summary = [
+            _EQ100,
+            "CODEBASE SUMMARY",
+            _EQ100,
+            f"Total Files: {stats['total_files']}",
+            f"Total Directories: {stats['total_directories']}",
+            f"Total Lines of Code: {stats['total_lines']}",
+            f"Root Directory: {self.root_path}",
+            "",
+        ]
         
         summary.append("Languages Found:")
         for language, count in sorted(stats['languages'].items()):
@@ -240,12 +514,14 @@ class CodebaseParser:
         
         summary.append("")
         summary.append("Directory Overview:")
-        for directory in sorted(structure.keys()):
-            file_count = len(structure[directory])
+        for directory, files in structure.items():
+            file_count = len(files)
             summary.append(f"  {directory}: {file_count} files")
         
-        summary.append("=" * 100)
-        return "\n".join(summary)
+        summary.append(_EQ100)
+        
+        # Small and bounded by directory count, so encode it in one write
+        out.write("\n".join(summary).encode('utf-8'))
 
     def parse_and_output(self) -> bool:
         """Main method to parse codebase and generate output"""
@@ -257,29 +533,40 @@ class CodebaseParser:
             print(f"Error: Directory {self.root_path} does not exist")
             return False
         
-        # Scan the directory structure
-        print("Scanning directory structure...")
-        structure = self.scan_directory(self.root_path)
-        
-        if not structure:
-            print("No code files found in the specified directory")
-            return False
-        
-        # Get project statistics
-        stats = self.get_project_stats(structure)
-        
-        print(f"Found {stats['total_files']} code files in {stats['total_directories']} directories")
-        
-        # Generate output
-        print("Generating formatted output...")
+        # Scan, read and format in one pass
+        print("Scanning directory structure and generating formatted output...")
+        structure = {}
         try:
-            with open(self.output_file, 'w', encoding='utf-8') as f:
-                # Write summary
-                f.write(self.generate_summary(structure, stats))
-                f.write("\n\n")
+            # The body is staged next to the output rather than in the system
+            # temp directory, which is often RAM-backed tmpfs
+            output_dir = os.path.dirname(os.path.abspath(self.output_file))
+            with tempfile.TemporaryFile('w+b', buffering=_OUTPUT_BUFFER_SIZE, dir=output_dir) as body:
+                # Stream code sections while the scan runs; the summary and
+                # structure tree go in front once the scan is complete
+                total_lines = self.generate_code_output(self._iter_pipeline(structure), _native_newlines(body))
+                
+                if not structure:
+                    print("No code files found in the specified directory")
+                    return False
+                
+                # Get project statistics
+                stats = self.get_project_stats(structure, total_lines)
                 
-                # Write detailed code content
-                f.write(self.generate_code_output(structure))
+                print(f"Found {stats['total_files']} code files in {stats['total_directories']} directories")
+                
+                with open(self.output_file, 'wb', buffering=_OUTPUT_BUFFER_SIZE) as f:
+                    out = _native_newlines(f)
+                    
+                    # Write summary
+                    self.generate_summary(structure, stats, out)
+                    out.write(b"\n\n")
+                    
+                    # Add structure overview
+                    self.format_directory_structure(structure, out)
+                    out.write(_SECTION_END)
+                    
+                    # Write detailed code content
+                    _append_file(body, f)
             
             print(f"Successfully generated: {self.output_file}")
             print(f"File size: {os.path.getsize(self.output_file)} bytes")
@@ -298,7 +585,10 @@ class CodebaseParser:
             print("No code files found")
             return
         
-        print(self.format_directory_structure(structure))
+        # Build the tree in memory and print it as text, so any stdout works
+        tree = io.BytesIO()
+        self.format_directory_structure(structure, tree)
+        print(tree.getvalue().decode('utf-8'))
         print(f"\nFound {sum(len(files) for files in structure.values())} code files")
 
 def main():
@@ -323,10 +613,7 @@ def main():
     # Add custom extensions if provided
     if args.extensions:
         custom_exts = [ext.strip() for ext in args.extensions.split(',')]
-        for ext in custom_exts:
-            if not ext.startswith('.'):
-                ext = '.' + ext
-            codebase_parser.code_extensions.add(ext.lower())
+        codebase_parser.add_code_extensions(custom_exts)
         print(f"Added custom extensions: {custom_exts}")
     
     # Run preview or full parse
@@ -337,6 +624,97 @@ def main():
         if not success:
             sys.exit(1)
 
+# Line patterns for complexity analysis, per language. Each pattern is
+# matched right after a line's leading whitespace; \s never crosses a line.
+_C_STYLE_COMMENT_PATTERNS = [r'//', r'/\*', r'\*']
+
+_COMMENT_PATTERNS = {
+    '.py': [r'#', r'"""', r"'''"],
+    '.js': _C_STYLE_COMMENT_PATTERNS,
+    '.ts': _C_STYLE_COMMENT_PATTERNS,
+    '.java': _C_STYLE_COMMENT_PATTERNS,
+    '.cpp': _C_STYLE_COMMENT_PATTERNS,
+    '.c': _C_STYLE_COMMENT_PATTERNS,
+}
+
+_FUNCTION_PATTERNS = {
+    '.py': [r'def\s+\w+', r'async\s+def\s+\w+'],
+    '.js': [r'function\s+\w+', r'const\s+\w+\s*=.*=>', r'\w+\s*:\s*function'],
+    '.ts': [r'function\s+\w+', r'const\s+\w+\s*=.*=>', r'\w+\s*\(.*\)\s*:\s*\w+\s*{'],
+    '.java': [r'(?:public|private|protected)?\s*(?:static)?\s*\w+\s+\w+\s*\('],
+    '.cpp': [r'\w+\s+\w+\s*\(', r'(?:public|private|protected):\s*\w+'],
+    '.c': [r'\w+\s+\w+\s*\('],
+}
+
+_CLASS_PATTERNS = {
+    '.py': [r'class\s+\w+'],
+    '.js': [r'class\s+\w+'],
+    '.ts': [r'class\s+\w+', r'interface\s+\w+', r'type\s+\w+'],
+    '.java': [r'(?:public|private)?\s*class\s+\w+', r'interface\s+\w+'],
+    '.cpp': [r'class\s+\w+', r'struct\s+\w+'],
+    '.c': [r'struct\s+\w+', r'typedef\s+struct'],
+}
+
+# Lines that count as both a function and a class (JS constructor functions)
+_FUNCTION_CLASS_PATTERNS = {
+    '.js': [r'function\s+[A-Z]\w+'],
+}
+
+
+def _compile_line_regex(ext: str) -> re.Pattern:
+    """Combine a language's patterns into one multiline named-group regex"""
+    groups = []
+    for name, table in (('comment', _COMMENT_PATTERNS), ('both', _FUNCTION_CLASS_PATTERNS),
+                        ('function', _FUNCTION_PATTERNS), ('class', _CLASS_PATTERNS)):
+        if ext in table:
+            groups.append(f"(?P<{name}>{'|'.join(table[ext])})")
+    pattern = r'^\s*(?:' + '|'.join(groups) + ')'
+    return re.compile(pattern.replace(r'\s', r'[^\S\n]'), re.MULTILINE)
+
+
+_BLANK_LINE_RE = re.compile(r'^[^\S\n]*$', re.MULTILINE)
+
+
+def _analyze_basic(content: str) -> Dict[str, int]:
+    """Count total and blank lines only, for languages with no line patterns"""
+    lines_total = content.count('\n') + (not content.endswith('\n'))
+    # The empty match after a trailing newline is not a line
+    lines_blank = len(_BLANK_LINE_RE.findall(content)) - content.endswith('\n')
+    return {
+        'lines_total': lines_total,
+        'lines_code': lines_total - lines_blank,
+        'lines_comment': 0,
+        'lines_blank': lines_blank,
+        'functions': 0,
+        'classes': 0
+    }
+
+
+def _make_analyzer(line_regex: re.Pattern) -> Callable[[str], Dict[str, int]]:
+    """Build an analyzer with a language's combined line regex baked in"""
+    finditer = line_regex.finditer
+    
+    def analyze(content: str) -> Dict[str, int]:
+        stats = _analyze_basic(content)
+        
+        # One pass over the whole text instead of matching line by line
+        counts = {'comment': 0, 'both': 0, 'function': 0, 'class': 0}
+        for match in finditer(content):
+            counts[match.lastgroup] += 1
+        
+        stats['lines_comment'] = counts['comment']
+        stats['lines_code'] -= counts['comment']
+        stats['functions'] = counts['function'] + counts['both']
+        stats['classes'] = counts['class'] + counts['both']
+        return stats
+    
+    return analyze
+
+
+# Per-extension analyzers, compiled once at import time; anything else
+# falls back to _analyze_basic
+_ANALYZERS = {ext: _make_analyzer(_compile_line_regex(ext)) for ext in _COMMENT_PATTERNS}
+
 # Enhanced version with additional features
 class AdvancedCodebaseParser(CodebaseParser):
     """Extended parser with additional features"""
@@ -345,129 +723,70 @@ class AdvancedCodebaseParser(CodebaseParser):
         super().__init__(root_path, output_file)
         self.file_stats = {}
     
-    def analyze_file_complexity(self, content: str, file_path: Path) -> Dict:
-        """Analyze basic complexity metrics of a file"""
+    def analyze_file_complexity(self, content: str, extension: str) -> Dict:
+        """Analyze basic complexity metrics of a file, given its lower-cased extension"""
         if not content or not isinstance(content, str):
             return {}
         
-        lines = content.splitlines()
-        stats = {
-            'lines_total': len(lines),
-            'lines_code': 0,
-            'lines_comment': 0,
-            'lines_blank': 0,
-            'functions': 0,
-            'classes': 0
-        }
-        
-        # Patterns for different languages
-        comment_patterns = {
-            '.py': [r'^\s*#', r'^\s*"""', r'^\s*\'\'\''],
-            '.js': [r'^\s*//', r'^\s*/\*', r'^\s*\*'],
-            '.ts': [r'^\s*//', r'^\s*/\*', r'^\s*\*'],
-            '.java': [r'^\s*//', r'^\s*/\*', r'^\s*\*'],
-            '.cpp': [r'^\s*//', r'^\s*/\*', r'^\s*\*'],
-            '.c': [r'^\s*//', r'^\s*/\*', r'^\s*\*'],
-        }
-        
-        function_patterns = {
-            '.py': [r'^\s*def\s+\w+', r'^\s*async\s+def\s+\w+'],
-            '.js': [r'^\s*function\s+\w+', r'^\s*const\s+\w+\s*=.*=>', r'^\s*\w+\s*:\s*function'],
-            '.ts': [r'^\s*function\s+\w+', r'^\s*const\s+\w+\s*=.*=>', r'^\s*\w+\s*\(.*\)\s*:\s*\w+\s*{'],
-            '.java': [r'^\s*(public|private|protected)?\s*(static)?\s*\w+\s+\w+\s*\('],
-            '.cpp': [r'^\s*\w+\s+\w+\s*\(', r'^\s*(public|private|protected):\s*\w+'],
-            '.c': [r'^\s*\w+\s+\w+\s*\('],
-        }
-        
-        class_patterns = {
-            '.py': [r'^\s*class\s+\w+'],
-            '.js': [r'^\s*class\s+\w+', r'^\s*function\s+[A-Z]\w+'],
-            '.ts': [r'^\s*class\s+\w+', r'^\s*interface\s+\w+', r'^\s*type\s+\w+'],
-            '.java': [r'^\s*(public|private)?\s*class\s+\w+', r'^\s*interface\s+\w+'],
-            '.cpp': [r'^\s*class\s+\w+', r'^\s*struct\s+\w+'],
-            '.c': [r'^\s*struct\s+\w+', r'^\s*typedef\s+struct'],
-        }
-        
-        ext = file_path.suffix.lower()
-        comment_regexes = [re.compile(pattern) for pattern in comment_patterns.get(ext, [])]
-        function_regexes = [re.compile(pattern) for pattern in function_patterns.get(ext, [])]
-        class_regexes = [re.compile(pattern) for pattern in class_patterns.get(ext, [])]
-        
-        for line in lines:
-            line_stripped = line.strip()
-            
-            if not line_stripped:
-                stats['lines_blank'] += 1
-            elif any(regex.match(line) for regex in comment_regexes):
-                stats['lines_comment'] += 1
-            else:
-                stats['lines_code'] += 1
-                
-                # Count functions and classes
-                if any(regex.match(line) for regex in function_regexes):
-                    stats['functions'] += 1
-                if any(regex.match(line) for regex in class_regexes):
-                    stats['classes'] += 1
-        
-        return stats
+        return _ANALYZERS.get(extension, _analyze_basic)(content)
 
-    def generate_enhanced_output(self, structure: Dict[str, List[Path]]) -> str:
-        """Generate enhanced output with code analysis"""
-        result = []
-        
-        # Add structure overview
-        result.append(self.format_directory_structure(structure))
-        result.append("\n" + "=" * 100 + "\n")
-        
-        # Process each directory
-        sorted_dirs = sorted(structure.keys())
+    def generate_enhanced_output(self, files: Iterable[Tuple[str, FileEntry, bytes]], out: BinaryIO) -> int:
+        """Stream enhanced sections with code analysis as files arrive
+
+        Returns the total number of lines written.
+        """
+        total_lines = 0
         
-        for directory in sorted_dirs:
-            files = sorted(structure[directory], key=lambda x: x.name)
-            
+        current_dir = None
+        for directory, file, content in files:
             # Directory header
-            result.append(self.generate_separator(directory.upper()))
-            result.append("")
+            if directory != current_dir:
+                current_dir = directory
+                out.write(f"\n{self.generate_separator(directory.upper())}\n".encode('utf-8'))
             
-            for file_path in files:
-                rel_path = file_path.relative_to(self.root_path)
-                file_name = file_path.stem
-                extension = file_path.suffix
-                language = self.get_language_from_extension(extension)
-                
-                # File header
-                file_header = f"{file_name}"
-                result.append(self.generate_separator(file_header))
-                result.append(f"File: {rel_path}")
-                result.append(f"Language: {language}")
-                
-                # Read content and analyze
-                content = self.read_file_content(file_path)
-                if content and isinstance(content, str):
-                    file_stats = self.analyze_file_complexity(content, file_path)
-                    self.file_stats[str(rel_path)] = file_stats
-                    
-                    if file_stats:
-                        result.append(f"Lines: {file_stats['lines_total']} "
-                                    f"(Code: {file_stats['lines_code']}, "
-                                    f"Comments: {file_stats['lines_comment']}, "
-                                    f"Blank: {file_stats['lines_blank']})")
-                        if file_stats['functions'] > 0:
-                            result.append(f"Functions: {file_stats['functions']}")
-                        if file_stats['classes'] > 0:
-                            result.append(f"Classes: {file_stats['classes']}")
-                
-                result.append("-" * 100)
+            file_name = file.name[:-len(file.ext)]
+            language = self.get_language_from_extension(file.ext)
+            
+            # File header
+            file_header = f"{file_name}"
+            header = [
+                "",
+                self.generate_separator(file_header),
+                f"File: {file.rel_path}",
+                f"Language: {language}",
+            ]
+            
+            # Analyze content; only the analysis needs it decoded
+            if content:
+                file_stats = self.analyze_file_complexity(str(content, 'utf-8'), file.ext)
+                self.file_stats[file.rel_path] = file_stats
                 
-                # Add file content
-                if content:
-                    result.append(content)
-                else:
-                    result.append("// Unable to read file content")
+                # Reuse the analysis line count rather than scanning the bytes again
+                total_lines += file_stats['lines_total']
                 
-                result.append("\n" + "=" * 100 + "\n")
+                if file_stats:
+                    header.append(f"Lines: {file_stats['lines_total']} "
+                                  f"(Code: {file_stats['lines_code']}, "
+                                  f"Comments: {file_stats['lines_comment']}, "
+                                  f"Blank: {file_stats['lines_blank']})")
+                    if file_stats['functions'] > 0:
+                        header.append(f"Functions: {file_stats['functions']}")
+                    if file_stats['classes'] > 0:
+                        header.append(f"Classes: {file_stats['classes']}")
+            
+            header.append(_DASH100)
+            header.append("")
+            out.write("\n".join(header).encode('utf-8'))
+            
+            # Add file content, already UTF-8 encoded
+            if content:
+                out.write(content)
+            else:
+                out.write(b"// Unable to read file content")
+            
+            out.write(_SECTION_END)
         
-        return "\n".join(result)
+        return total_lines
 
     def parse_and_output(self) -> bool:
         """Enhanced parsing with code analysis"""
@@ -478,25 +797,37 @@ class AdvancedCodebaseParser(CodebaseParser):
             print(f"Error: Directory {self.root_path} does not exist")
             return False
         
-        print("Scanning directory structure...")
-        structure = self.scan_directory(self.root_path)
-        
-        if not structure:
-            print("No code files found in the specified directory")
-            return False
-        
-        stats = self.get_project_stats(structure)
-        print(f"Found {stats['total_files']} code files in {stats['total_directories']} directories")
-        
-        print("Analyzing code and generating output...")
+        print("Scanning directory structure, analyzing code and generating output...")
+        structure = {}
         try:
-            with open(self.output_file, 'w', encoding='utf-8') as f:
-                # Write summary
-                f.write(self.generate_summary(structure, stats))
-                f.write("\n\n")
+            # The body is staged next to the output rather than in the system
+            # temp directory, which is often RAM-backed tmpfs
+            output_dir = os.path.dirname(os.path.abspath(self.output_file))
+            with tempfile.TemporaryFile('w+b', buffering=_OUTPUT_BUFFER_SIZE, dir=output_dir) as body:
+                # Stream analyzed sections while the scan runs; the summary and
+                # structure tree go in front once the scan is complete
+                total_lines = self.generate_enhanced_output(self._iter_pipeline(structure), _native_newlines(body))
                 
-                # Write enhanced output with analysis
-                f.write(self.generate_enhanced_output(structure))
+                if not structure:
+                    print("No code files found in the specified directory")
+                    return False
+                
+                stats = self.get_project_stats(structure, total_lines)
+                print(f"Found {stats['total_files']} code files in {stats['total_directories']} directories")
+                
+                with open(self.output_file, 'wb', buffering=_OUTPUT_BUFFER_SIZE) as f:
+                    out = _native_newlines(f)
+                    
+                    # Write summary
+                    self.generate_summary(structure, stats, out)
+                    out.write(b"\n\n")
+                    
+                    # Add structure overview
+                    self.format_directory_structure(structure, out)
+                    out.write(_SECTION_END)
+                    
+                    # Write enhanced output with analysis
+                    _append_file(body, f)
             
             print(f"Successfully generated: {self.output_file}")
             print(f"File size: {os.path.getsize(self.output_file)} bytes")